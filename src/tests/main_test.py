@@ -1,102 +1,567 @@
-"""Main test runner."""
-
-from qiskit import QuantumCircuit
-from qiskit.transpiler import CouplingMap, PassManager
-from qiskit.transpiler.passes import (
-    ApplyLayout,
-    BasicSwap,
-    EnlargeWithAncilla,
-    FullAncillaAllocation,
-    SabreLayout,
-    SabreSwap,
-    TrivialLayout,
-)
-
-from transpile_benchy.passmanagers.abc_runner import CustomPassManager
-
-# from transpile_benchy.metrics import DepthMetric
-# depth_metric = DepthMetric(basis_gate=CXGate())
-
-
-class Trivial_Basic(CustomPassManager):
-    """Custom pass manager."""
-
-    def build_pre_stage(self):
-        """Build the pre-process PassManager."""
-        return super().build_pre_stage()
-
-    def build_post_stage(self):
-        """Build the post-process PassManager."""
-        pm = PassManager()
-        # pm.append(depth_metric.get_pass())
-        return pm
-
-    def build_main_stage(self):
-        """Process the circuit."""
-        pm = PassManager()
-        pm.append(
-            [
-                TrivialLayout(self.coupling),
-                FullAncillaAllocation(self.coupling),
-                EnlargeWithAncilla(),
-                ApplyLayout(),
-                BasicSwap(self.coupling),
-            ]
-        )
-        return pm
-
-
-class SABRE(CustomPassManager):
-    """Custom pass manager."""
-
-    def build_pre_stage(self):
-        """Build the pre-process PassManager."""
-        return super().build_pre_stage()
-
-    def build_post_stage(self):
-        """Build the post-process PassManager."""
-        pm = PassManager()
-        # pm.append(depth_metric.get_pass())
-        return pm
-
-    def build_main_stage(self):
-        """Process the circuit."""
-        pm = PassManager()
-        pm.append(
-            [
-                SabreLayout(self.coupling),
-                # FullAncillaAllocation(coupling_map),
-                # EnlargeWithAncilla(),
-                # ApplyLayout(),
-                SabreSwap(self.coupling),
-            ]
-        )
-        return pm
-
-
-def test_custom_pass_manager_trivial_basic():
-    """Test custom pass manager."""
-    coupling_map = CouplingMap.from_grid(4, 5)
-    manager = Trivial_Basic(coupling=coupling_map)
-    circuit = QuantumCircuit(2, 2)
-    circuit.h(0)
-    circuit.cx(0, 1)
-    circuit.measure([0, 1], [0, 1])
-    transpiled_circuit = manager.run(circuit)
-    assert (
-        transpiled_circuit.depth() <= circuit.depth()
-    ), "Transpiled circuit should not be deeper than original."
-
-
-def test_custom_pass_manager_sabre():
-    """Test custom pass manager."""
-    coupling_map = CouplingMap.from_grid(4, 5)
-    manager = SABRE(coupling=coupling_map)
-    circuit = QuantumCircuit(2, 2)
-    circuit.h(0)
-    circuit.cx(0, 1)
-    circuit.measure([0, 1], [0, 1])
-    transpiled_circuit = manager.run(circuit)
-    assert (
-        transpiled_circuit.depth() <= circuit.depth()
-    ), "Transpiled circuit should not be deeper than original."
+"""Main test runner."""
+
+import logging
+import math
+import os
+import statistics
+import threading
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+from qiskit import QuantumCircuit
+from qiskit.circuit.library import QFT
+from qiskit.transpiler import CouplingMap, PassManager
+from qiskit.transpiler.basepasses import AnalysisPass
+from qiskit.transpiler.passes import (
+    ApplyLayout,
+    BasicSwap,
+    EnlargeWithAncilla,
+    FullAncillaAllocation,
+    SabreLayout,
+    SabreSwap,
+    TrivialLayout,
+)
+
+from transpile_benchy.benchmark import Benchmark, _prefetch
+from transpile_benchy.interfaces import qasm_interface
+from transpile_benchy.interfaces.abc_interface import (
+    SubmoduleInterface,
+    compile_filters,
+)
+from transpile_benchy.interfaces.qasm_interface import Queko, _load_qasm_file
+from transpile_benchy.interfaces.qiskit_interface import QiskitFunctionInterface
+from transpile_benchy.metrics.abc_metrics import MetricInterface, Result
+from transpile_benchy.passmanagers.abc_runner import ThreeStageRunner
+from transpile_benchy.passmanagers.qiskit_baseline import QiskitBaseline
+from transpile_benchy.render import plot_benchmark_grid
+
+# from transpile_benchy.metrics import DepthMetric
+# depth_metric = DepthMetric(basis_gate=CXGate())
+
+
+class Trivial_Basic(ThreeStageRunner):
+    """Custom pass manager."""
+
+    is_stochastic = False
+
+    def __init__(self, coupling, name=None):
+        """Initialize the runner."""
+        super().__init__(name)
+        self.coupling = coupling
+
+    def build_pre_stage(self):
+        """Build the pre-process PassManager."""
+        return super().build_pre_stage()
+
+    def build_post_stage(self):
+        """Build the post-process PassManager."""
+        pm = PassManager()
+        # pm.append(depth_metric.get_pass())
+        return pm
+
+    def build_main_stage(self):
+        """Process the circuit."""
+        pm = PassManager()
+        pm.append(
+            [
+                TrivialLayout(self.coupling),
+                FullAncillaAllocation(self.coupling),
+                EnlargeWithAncilla(),
+                ApplyLayout(),
+                BasicSwap(self.coupling),
+            ]
+        )
+        return pm
+
+
+class DepthPass(AnalysisPass):
+    """Record the depth of the circuit."""
+
+    def run(self, dag):
+        """Save the depth in the property set."""
+        self.property_set["depth"] = dag.depth()
+
+
+class DepthMetric(MetricInterface):
+    """Depth of the transpiled circuit."""
+
+    def __init__(self):
+        """Initialize the metric."""
+        super().__init__(name="depth", pretty_name="Depth")
+
+    def _construct_pass(self):
+        """Return the pass associated with this metric."""
+        return DepthPass()
+
+
+class FailingPass(AnalysisPass):
+    """Fail on the ghz_5 circuit."""
+
+    def run(self, dag):
+        """Raise on ghz_5."""
+        if dag.name == "ghz_5":
+            raise RuntimeError("unsupported circuit")
+
+
+class Failing(Trivial_Basic):
+    """Transpiler failing on some circuits."""
+
+    is_stochastic = True
+
+    def build_pre_stage(self):
+        """Build the pre-process PassManager."""
+        return PassManager(FailingPass())
+
+
+class CircuitList(SubmoduleInterface):
+    """Submodule serving a fixed list of circuits."""
+
+    def __init__(self, circuits):
+        """Initialize the submodule."""
+        super().__init__()
+        self.raw_circuits = circuits
+
+    def _get_quantum_circuits(self):
+        """Return an iterator over the circuits."""
+        return iter(self.raw_circuits)
+
+
+class SABRE(ThreeStageRunner):
+    """Custom pass manager."""
+
+    def __init__(self, coupling, name=None):
+        """Initialize the runner."""
+        super().__init__(name)
+        self.coupling = coupling
+
+    def build_pre_stage(self):
+        """Build the pre-process PassManager."""
+        return super().build_pre_stage()
+
+    def build_post_stage(self):
+        """Build the post-process PassManager."""
+        pm = PassManager()
+        # pm.append(depth_metric.get_pass())
+        return pm
+
+    def build_main_stage(self):
+        """Process the circuit."""
+        pm = PassManager()
+        pm.append(
+            [
+                SabreLayout(self.coupling),
+                # FullAncillaAllocation(coupling_map),
+                # EnlargeWithAncilla(),
+                # ApplyLayout(),
+                SabreSwap(self.coupling),
+            ]
+        )
+        return pm
+
+
+@pytest.fixture(scope="module")
+def coupling_map():
+    """Build the coupling map shared by the tests."""
+    return CouplingMap.from_grid(4, 5)
+
+
+@pytest.fixture(scope="module")
+def circuit():
+    """Build the circuit shared by the tests."""
+    circuit = QuantumCircuit(2, 2)
+    circuit.h(0)
+    circuit.cx(0, 1)
+    circuit.measure([0, 1], [0, 1])
+    return circuit
+
+
+@pytest.mark.parametrize("manager_cls", [Trivial_Basic, SABRE])
+def test_custom_pass_manager(manager_cls, coupling_map, circuit):
+    """Test custom pass manager."""
+    manager = manager_cls(coupling=coupling_map)
+    transpiled_circuit = manager.run(circuit)
+    assert (
+        transpiled_circuit.depth() <= circuit.depth()
+    ), "Transpiled circuit should not be deeper than original."
+
+
+@pytest.fixture(scope="module")
+def ghz_circuits():
+    """Build GHZ circuits of a few sizes."""
+    circuits = []
+    for num_qubits in range(2, 6):
+        qc = QuantumCircuit(num_qubits, name=f"ghz_{num_qubits}")
+        qc.h(0)
+        for target in range(1, num_qubits):
+            qc.cx(0, target)
+        circuits.append(qc)
+    return circuits
+
+
+def build_benchmark(transpilers, circuits, **kwargs):
+    """Build a benchmark measuring the depth of the circuits."""
+    return Benchmark(
+        transpilers,
+        [CircuitList(circuits)],
+        [DepthMetric()],
+        logger=logging.getLogger(__name__),
+        **kwargs,
+    )
+
+
+def test_parallel_run_after_serial_run(ghz_circuits):
+    """Test a parallel run in a process that already ran Qiskit passes."""
+    coupling_map = CouplingMap.from_line(6)
+    for num_workers in (1, 2):
+        transpiler = QiskitBaseline(3, coupling_map=coupling_map)
+        benchmark = build_benchmark([transpiler], ghz_circuits, num_workers=num_workers)
+        benchmark.run()
+        results = benchmark.metrics[0].saved_results[transpiler.name]
+        assert len(results) == len(ghz_circuits)
+
+
+def test_parallel_run_failure(ghz_circuits, tmp_path):
+    """Test a failing task stops a parallel run, keeping finished pairs."""
+    results_path = tmp_path / "results.jsonl"
+    benchmark = build_benchmark(
+        [Failing(CouplingMap.from_line(6))],
+        ghz_circuits * 5,
+        num_workers=2,
+        num_runs=4,
+        results_path=str(results_path),
+    )
+    with pytest.raises(ValueError, match="Transpiler failed"):
+        benchmark.run()
+    assert "ghz_2" in results_path.read_text()
+
+
+def test_result_add_trials_from_generator():
+    """Test trials given as a generator are counted in the statistics."""
+    result = Result(DepthMetric())
+    result.add_trials(value for value in [4, 2, 6])
+    assert result.trials == [4, 2, 6]
+    assert result.average == pytest.approx(4.0)
+    assert (result.best, result.worst) == (2, 6)
+
+
+def test_loaded_qasm_circuit_is_a_copy(tmp_path):
+    """Test changing a loaded circuit leaves the cached one untouched."""
+    file = tmp_path / "bell.qasm"
+    file.write_text(
+        'OPENQASM 2.0;\ninclude "qelib1.inc";\n'
+        "qreg q[2];\nrz(0.5) q[0];\ncx q[0],q[1];\n"
+    )
+    circuit = _load_qasm_file(file)
+    circuit.x(1)
+    circuit.data[0].operation.params[0] = 1.0
+    reloaded = _load_qasm_file(file)
+    assert reloaded.name == "bell"
+    assert reloaded.size() == 2
+    assert reloaded.data[0].operation.params == [0.5]
+
+
+@pytest.mark.parametrize(
+    "num_workers, expected", [(None, os.cpu_count() or 1), (0, 0), (1, 1), (2, 2)]
+)
+def test_num_workers(num_workers, expected, ghz_circuits):
+    """Test None uses every CPU, while 0 and 1 both run serially."""
+    benchmark = build_benchmark([], ghz_circuits, num_workers=num_workers)
+    assert benchmark.num_workers == expected
+    submodule = Queko(num_workers=num_workers)
+    assert submodule.num_workers == expected
+
+
+def test_parallel_qasm_loading():
+    """Test parsing in a process pool yields the circuits in order."""
+    filter_list = ["16QBT_05CYC_TFL"]
+    serial = [qc.name for qc in Queko(filter_list).get_quantum_circuits()]
+    parallel = Queko(filter_list, num_workers=2).get_quantum_circuits()
+    assert serial
+    assert [qc.name for qc in parallel] == serial
+
+
+def test_summary_statistics_zero_baseline(coupling_map):
+    """Test circuits with a zero baseline average are left out."""
+    baseline = Trivial_Basic(coupling_map, name="baseline")
+    other = Trivial_Basic(coupling_map, name="other")
+    benchmark = build_benchmark([baseline, other], [])
+    metric = benchmark.metrics[0]
+    for name, value_1, value_2 in [("a", 0, 5), ("b", 4, 2), ("c", 4, 6)]:
+        metric.save_results(baseline.name, name, [value_1])
+        metric.save_results(other.name, name, [value_2])
+    statistics = benchmark.summary_statistics(metric, baseline, other)
+    assert statistics["percent_changes"] == {"b": -50.0, "c": 50.0}
+    assert statistics["average_change"] == 0.0
+    assert statistics["best_circuit"] == "b"
+    assert statistics["worst_circuit"] == "c"
+
+
+def test_plot_benchmark_grid(coupling_map, ghz_circuits):
+    """Test the grid plot returns an open figure with a row per metric."""
+    if "ipynb" not in plt.style.available:
+        pytest.skip("LovelyPlots styles are not installed")
+    transpilers = [Trivial_Basic(coupling_map), SABRE(coupling_map)]
+    benchmark = build_benchmark(transpilers, ghz_circuits)
+    benchmark.run()
+    fig = plot_benchmark_grid(benchmark, usetex=False, show=False)
+    assert plt.fignum_exists(fig.number)
+    assert len(fig.axes) == 2
+    plt.close(fig)
+
+
+def test_qiskit_baseline_run_batch(coupling_map, ghz_circuits):
+    """Test run_batch measures each run and builds the stage once."""
+    transpiler = QiskitBaseline(1, coupling_map=coupling_map)
+    transpiler._install_metric_passes([DepthMetric()])
+    property_sets = transpiler.run_batch(ghz_circuits[-1], 3)
+    assert len(property_sets) == 3
+    assert all(property_set["depth"] > 0 for property_set in property_sets)
+    stages = transpiler._get_stages()
+    transpiler.run(ghz_circuits[0])
+    assert transpiler._get_stages() is stages
+
+
+def test_resume_from_results_path(coupling_map, ghz_circuits, tmp_path):
+    """Test a resumed run reloads the results and skips completed pairs."""
+    results_path = tmp_path / "results.jsonl"
+    transpilers = [Trivial_Basic(coupling_map), SABRE(coupling_map)]
+    benchmark = build_benchmark(
+        transpilers, ghz_circuits, results_path=str(results_path)
+    )
+    benchmark.run()
+    saved = results_path.read_text()
+    assert len(saved.splitlines()) == len(transpilers) * len(ghz_circuits)
+
+    resumed = build_benchmark(transpilers, ghz_circuits, results_path=str(results_path))
+    resumed.run()
+    assert results_path.read_text() == saved
+    expected = benchmark.metrics[0].saved_results
+    actual = resumed.metrics[0].saved_results
+    assert actual.keys() == expected.keys()
+    for transpiler_name, results in expected.items():
+        assert actual[transpiler_name].keys() == results.keys()
+        for circuit_name, result in results.items():
+            reloaded = actual[transpiler_name][circuit_name]
+            assert reloaded.trials == result.trials
+            assert reloaded.average == pytest.approx(result.average)
+            assert reloaded.stderr == pytest.approx(result.stderr)
+
+
+def test_results_path_keeps_integers(tmp_path):
+    """Test NumPy integer trials are reloaded as integers."""
+    results_path = str(tmp_path / "results.jsonl")
+    benchmark = build_benchmark([], [], results_path=results_path)
+    benchmark._save_trials("t", "c", {"depth": [np.int64(3), np.float64(2.5)]})
+    resumed = build_benchmark([], [], results_path=results_path)
+    trials = resumed.metrics[0].saved_results["t"]["c"].trials
+    assert trials == [3, 2.5]
+    assert type(trials[0]) is int
+
+
+def test_results_path_skips_other_rows(tmp_path):
+    """Test rows that are not results are skipped, like undecodable ones."""
+    results_path = tmp_path / "results.jsonl"
+    rows = [
+        '{"transpiler": "t", "circuit": "a", "trials": {"depth": [1]}}',
+        '{"transpiler": "t", "circuit": "b"}',
+        '{"circuit": "c", "trials": {"depth": [1]}}',
+        '{"transpiler": "t", "circuit": "d", "trials": [1]}',
+        "[1, 2]",
+        "3",
+        '{"transpiler": "t", "circuit": "e", "tri',
+    ]
+    results_path.write_text("\n".join(rows))
+    benchmark = build_benchmark([], [], results_path=str(results_path))
+    assert list(benchmark.metrics[0].saved_results["t"]) == ["a"]
+    assert benchmark._completed == {("t", "a")}
+
+
+@pytest.mark.parametrize("trials, expected", [([2, 8], 4.0), ([0, 8], 0.0)])
+def test_result_geometric_mean(trials, expected):
+    """Test the geometric mean, which is 0 with a zero trial."""
+    metric = DepthMetric()
+    metric.use_geometric_mean = True
+    assert Result(metric, trials).average == pytest.approx(expected)
+
+
+def test_result_geometric_mean_negative():
+    """Test the geometric mean of a negative trial is NaN."""
+    metric = DepthMetric()
+    metric.use_geometric_mean = True
+    assert math.isnan(Result(metric, [-2, 8]).average)
+
+
+def test_parallel_matches_serial(coupling_map, ghz_circuits):
+    """Test a parallel run saves the same results as a serial run."""
+    results = []
+    for num_workers in (1, 4):
+        transpilers = [Trivial_Basic(coupling_map), SABRE(coupling_map)]
+        benchmark = build_benchmark(transpilers, ghz_circuits, num_workers=num_workers)
+        benchmark.run()
+        results.append(benchmark.metrics[0].saved_results)
+    serial, parallel = results
+    # saved in the same order, not just the same pairs
+    assert list(parallel) == list(serial)
+    for transpiler_name in serial:
+        assert list(parallel[transpiler_name]) == list(serial[transpiler_name])
+        for circuit_name in serial[transpiler_name]:
+            assert len(parallel[transpiler_name][circuit_name].trials) == 3
+    # the deterministic transpiler gives the same trials either way
+    for circuit_name, result in serial["Trivial_Basic"].items():
+        assert parallel["Trivial_Basic"][circuit_name].trials == result.trials
+
+
+def test_deterministic_transpiler_runs_once(coupling_map, ghz_circuits):
+    """Test a deterministic transpiler is run once, its result saved per run."""
+    runs = []
+
+    class Counting(Trivial_Basic):
+        """Transpiler recording how many runs it is asked for."""
+
+        def run_batch(self, circuit, num_runs):
+            """Record num_runs, then run."""
+            runs.append(num_runs)
+            return super().run_batch(circuit, num_runs)
+
+    benchmark = build_benchmark([Counting(coupling_map)], ghz_circuits[:1], num_runs=3)
+    benchmark.run()
+    assert runs == [1]
+    result = benchmark.metrics[0].saved_results["Counting"]["ghz_2"]
+    assert len(result.trials) == 3
+    assert len(set(result.trials)) == 1
+
+
+def test_result_stderr():
+    """Test the running standard error matches the two-pass formula."""
+    trials = [3, 5, 4, 10, 7]
+    result = Result(DepthMetric(), trials[:2])
+    result.add_trials(trials[2:])
+    expected = statistics.stdev(trials) / math.sqrt(len(trials))
+    assert result.stderr == pytest.approx(expected)
+    assert Result(DepthMetric(), [3]).stderr == 0.0
+
+
+@pytest.fixture
+def three_transpilers(coupling_map):
+    """Build a benchmark of three transpilers with saved results."""
+    transpilers = [Trivial_Basic(coupling_map, name=name) for name in ("a", "b", "c")]
+    benchmark = build_benchmark(transpilers, [])
+    metric = benchmark.metrics[0]
+    for transpiler, value in zip(transpilers, [4, 2, 6]):
+        metric.save_results(transpiler.name, "ghz_2", [value])
+    return benchmark
+
+
+def test_summary_statistics_no_common_circuits(three_transpilers):
+    """Test transpilers without a common circuit give NaN statistics."""
+    benchmark = three_transpilers
+    metric = benchmark.metrics[0]
+    t1, _, t3 = benchmark.transpilers
+    metric.saved_results.pop(t3.name)
+    metric.save_results(t3.name, "ghz_3", [5])
+    statistics = benchmark.summary_statistics(metric, t1, t3)
+    assert math.isnan(statistics["average_change"])
+    assert statistics["best_circuit"] is None
+    assert statistics["worst_circuit"] is None
+    assert statistics["percent_changes"] == {}
+
+
+def test_summary_statistics_without_changes(three_transpilers):
+    """Test include_changes=False leaves out the per-circuit changes."""
+    benchmark = three_transpilers
+    metric = benchmark.metrics[0]
+    t1, t2, _ = benchmark.transpilers
+    statistics = benchmark.summary_statistics(metric, t1, t2, include_changes=False)
+    assert "percent_changes" not in statistics
+    assert statistics["best_circuit"] == "ghz_2"
+
+
+def test_summary_statistics_all_pairs(three_transpilers):
+    """Test summary statistics of every pair of transpilers."""
+    benchmark = three_transpilers
+    metric = benchmark.metrics[0]
+    statistics = benchmark.summary_statistics(metric)
+    assert list(statistics) == [("a", "b"), ("a", "c"), ("b", "c")]
+    assert statistics[("a", "b")]["average_change"] == pytest.approx(-50.0)
+    assert statistics[("b", "c")]["average_change"] == pytest.approx(200.0)
+
+
+def test_qasm_cache_sees_edited_file(tmp_path):
+    """Test an edited QASM file is parsed again."""
+    file = tmp_path / "edited.qasm"
+    header = 'OPENQASM 2.0;\ninclude "qelib1.inc";\nqreg q[2];\n'
+    file.write_text(header + "h q[0];\n")
+    assert _load_qasm_file(file).size() == 1
+    file.write_text(header + "h q[0];\ncx q[0],q[1];\n")
+    assert _load_qasm_file(file).size() == 2
+
+
+def test_qiskit_function_names():
+    """Test each qubit count gives its own circuit, named after it."""
+    submodule = QiskitFunctionInterface(QFT, [3, 4])
+    names = [qc.name for qc in submodule.get_quantum_circuits()]
+    assert names == ["qft_3", "qft_4"]
+    assert submodule.circuit_count() == 2
+
+
+def _fail_to_parse(key):
+    """Stand in for the QASM parser, which should not be called."""
+    raise AssertionError(f"{key[0]} parsed again")
+
+
+def test_qasm_cache_size(monkeypatch):
+    """Test a second pass parses nothing, and the cache size can be changed."""
+    try:
+        # start from an empty cache of the default size
+        qasm_interface.set_qasm_cache_size(qasm_interface.QASM_CACHE_SIZE)
+        submodule = Queko(["16QBT_05CYC_TFL"])
+        first = [qc.name for qc in submodule.get_quantum_circuits()]
+        assert len(qasm_interface._qasm_cache) == submodule.circuit_count()
+        monkeypatch.setattr(qasm_interface, "_read_qasm_file", _fail_to_parse)
+        second = [qc.name for qc in submodule.get_quantum_circuits()]
+        assert second == first
+        qasm_interface.set_qasm_cache_size(1)
+        assert qasm_interface._qasm_cache.maxsize == 1
+    finally:
+        qasm_interface.set_qasm_cache_size(qasm_interface.QASM_CACHE_SIZE)
+
+
+def test_parallel_load_fills_qasm_cache(monkeypatch):
+    """Test files parsed by workers are cached in this process."""
+    try:
+        qasm_interface.set_qasm_cache_size(qasm_interface.QASM_CACHE_SIZE)
+        submodule = Queko(["16QBT_05CYC_TFL"], num_workers=2)
+        first = [qc.name for qc in submodule.get_quantum_circuits()]
+        assert len(qasm_interface._qasm_cache) == submodule.circuit_count()
+        monkeypatch.setattr(qasm_interface, "_read_qasm_file", _fail_to_parse)
+        second = [qc.name for qc in submodule.get_quantum_circuits()]
+        assert second == first
+    finally:
+        qasm_interface.set_qasm_cache_size(qasm_interface.QASM_CACHE_SIZE)
+
+
+def test_compile_filters():
+    """Test a str filter is one pattern and a list matches any pattern."""
+    assert compile_filters("QSE").search("54QBT_25CYC_QSE_3")
+    assert not compile_filters("QSE").search("16QBT_05CYC_TFL_0")
+    either = compile_filters(["QSE", "TFL"])
+    assert either.search("54QBT_25CYC_QSE_3")
+    assert either.search("16QBT_05CYC_TFL_0")
+    assert Queko("QSE").circuit_count() == len(Queko(["QSE"]).raw_circuits)
+
+
+def test_prefetch_stops_when_consumer_stops():
+    """Test stopping early ends the prefetch thread and closes the source."""
+    closed = threading.Event()
+
+    def source():
+        try:
+            yield from range(100)
+        finally:
+            closed.set()
+
+    items = _prefetch(source(), size=2)
+    assert next(items) == 0
+    items.close()
+    assert closed.wait(timeout=5)
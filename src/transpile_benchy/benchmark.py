@@ -5,16 +5,157 @@ calculates metrics on the transpiled circuits, and plots the results.
 The plots compare the metrics of the different transpilers on each
 circuit.
 """
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # only needed for annotations
+    from transpile_benchy.interfaces.abc_interface import SubmoduleInterface
+
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import re
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from io import BytesIO
 from logging import Logger
-from typing import List
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from qiskit import QuantumCircuit
+import numpy as np
+from qiskit import QuantumCircuit, qpy
 from tqdm import tqdm
 
-from transpile_benchy.interfaces.abc_interface import SubmoduleInterface
 from transpile_benchy.metrics.abc_metrics import MetricInterface
 from transpile_benchy.passmanagers.abc_runner import CustomPassManager
 
+# number of circuits loaded ahead of the one being transpiled
+PREFETCH_SIZE = 2
+
+_PREFETCH_DONE = object()
+# seconds between checks by the prefetch thread that it is still wanted
+_PREFETCH_POLL = 0.1
+
+# seconds between progress bar redraws
+PROGRESS_MININTERVAL = 0.5
+
+# line formats of the printed results, see Benchmark.__str__
+TRANSPILER_FMT = "\nTranspiler: {}"
+METRIC_FMT = "\n  Metric: {}"
+ROW_FMT = (
+    "  Circuit: {:<20}                     "
+    "Mean result: {:<10.3f}                     "
+    "Trials: {}"
+)
+
+# circuits whose names contain any of these are left out of the benchmark
+REJECTED_NAME_PATTERNS = ("square_root",)
+
+_REJECTED_NAMES = re.compile("|".join(map(re.escape, REJECTED_NAME_PATTERNS)))
+
+
+def _prefetch(iterator: Iterator, size: int = PREFETCH_SIZE) -> Iterator:
+    """Yield from an iterator, loading up to size items ahead in a thread.
+
+    This overlaps loading the next circuits, e.g. parsing QASM files,
+    with the transpilation of the current one, while holding at most
+    size circuits in memory. Errors raised by the iterator are re-raised
+    in the consumer. If the consumer stops early, the thread stops too
+    and closes the iterator, e.g. to shut down a pool feeding it.
+    """
+    buffer = queue.Queue(maxsize=size)
+    stop = threading.Event()
+
+    def _put(entry) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(entry, timeout=_PREFETCH_POLL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _producer():
+        try:
+            for item in iterator:
+                if not _put((item, None)):
+                    return
+            _put((_PREFETCH_DONE, None))
+        except Exception as e:
+            _put((_PREFETCH_DONE, e))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    threading.Thread(target=_producer, daemon=True).start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if item is _PREFETCH_DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+def _init_worker():
+    """Prepare a worker process to run Qiskit.
+
+    A forked worker inherits the parent's Rust thread pool without its
+    threads, so once the parent has run a multithreaded pass (e.g.
+    SabreSwap) the same pass in the worker waits forever. Qiskit runs
+    those passes single threaded when this is set, as it does in its own
+    worker processes.
+    """
+    os.environ["QISKIT_IN_PARALLEL"] = "TRUE"
+
+
+def _json_default(value):
+    """Convert the NumPy scalars returned by some passes for json.dumps.
+
+    Integers stay integers, so trials reload as they were saved.
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _serialize_circuit(circuit: QuantumCircuit) -> bytes:
+    """Serialize a circuit with QPY, to be shipped to worker processes."""
+    buffer = BytesIO()
+    qpy.dump(circuit, buffer)
+    return buffer.getvalue()
+
+
+def _transpile_and_measure(
+    transpiler: CustomPassManager,
+    circuit_qpy: bytes,
+    metric_names: List[str],
+    num_runs: int,
+) -> List[Dict]:
+    """Run a transpiler on a circuit and collect the metric results.
+
+    Defined at module level so it can be dispatched to a worker process.
+    The circuit is passed in QPY form, see _serialize_circuit. Returns one
+    {metric_name: result} dictionary per run.
+    """
+    circuit = qpy.load(BytesIO(circuit_qpy))[0]
+    try:
+        property_sets = transpiler.run_batch(circuit, num_runs)
+    except Exception as e:
+        raise ValueError("Transpiler failed") from e
+    return [
+        {name: property_set.get(name) for name in metric_names}
+        for property_set in property_sets
+    ]
+
 
 class Benchmark:
     """Benchmark runner."""
@@ -26,80 +167,314 @@ class Benchmark:
         metrics: List[MetricInterface],
         logger: Logger = None,
         num_runs: int = 3,
+        num_workers: Optional[int] = 1,
+        start_method: Optional[str] = None,
+        prefetch_size: int = PREFETCH_SIZE,
+        results_path: Optional[str] = None,
     ):
-        """Initialize benchmark runner."""
+        """Initialize benchmark runner.
+
+        If num_workers is greater than 1, the transpilations are
+        dispatched to a pool of that many worker processes; None uses one
+        per CPU, and 0 or 1 runs serially. start_method selects how they
+        are started, e.g. "spawn" to avoid inheriting forked state; None
+        uses the platform default. Note that "spawn" requires the
+        transpilers to be importable, not defined in a notebook. In a
+        serial run, up to prefetch_size circuits are loaded ahead on a
+        background thread; 0 disables it. In a parallel run, up to
+        max(1, prefetch_size) tasks per worker are queued at a time.
+
+        If results_path is given, the trials of each (transpiler, circuit)
+        pair are appended to it as a JSON line as soon as they are done.
+        Results already in the file are loaded here and their pairs are
+        skipped by run(), so an interrupted benchmark can be resumed.
+        """
         self.transpilers = transpilers
         self.submodules = submodules
         self.metrics = metrics
         self.circuit_names = []
         self.num_runs = num_runs
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        self.num_workers = num_workers
+        self.start_method = start_method
+        self.prefetch_size = prefetch_size
+        self.results_path = results_path
         self.logger = logger
 
         # check that all the transpilers have different names
-        if len(set([t.name for t in self.transpilers])) != len(self.transpilers):
+        self.transpiler_names = tuple(t.name for t in self.transpilers)
+        if len(set(self.transpiler_names)) != len(self.transpilers):
             raise ValueError("Transpilers must have unique names")
 
+        # identity sets, to validate arguments without scanning the lists
+        self._transpiler_ids = {id(t) for t in self.transpilers}
+        self._metric_ids = {id(m) for m in self.metrics}
+
         # give each transpiler a reference to the metrics
         for transpiler in self.transpilers:
-            transpiler._clear_metrics()
-            for metric in self.metrics:
-                transpiler._append_metric_pass(metric)
+            transpiler._install_metric_passes(self.metrics)
+
+        # (transpiler_name, circuit_name) pairs already in results_path
+        self._completed = set()
+        if results_path is not None and os.path.exists(results_path):
+            self._load_results()
 
-    def _filter_circuit(self, circuit: QuantumCircuit) -> bool:
+    @staticmethod
+    def _filter_circuit(circuit: QuantumCircuit) -> bool:
         """Filter out unwanted circuits based on their properties.
 
         Return True if the circuit should be included in the benchmark.
         """
-        if circuit.num_qubits < 2:
+        # checks are ordered by cost, circuit.depth() walks the whole circuit
+        if circuit.num_qubits < 2 or circuit.num_qubits > 36:
             return False
-        if "square_root" in circuit.name:
+        if _REJECTED_NAMES.search(circuit.name):
             return False
-        return circuit.depth() <= 800 and circuit.num_qubits <= 36
+        return circuit.depth() <= 800
 
-    def _try_transpilation(self, transpiler, circuit):
-        """Attempt to transpile, returns transpiled circuit or raises Error."""
-        if not self._filter_circuit(circuit):
-            self.logger.debug(f"Skipping circuit {circuit.name} due to filtering")
-            return None
+    def _run_counts(self, transpiler: CustomPassManager) -> Tuple[int, int]:
+        """Return how many times to run a transpiler and save each result.
+
+        A deterministic transpiler is run once and its result saved
+        num_runs times, so the statistics stay comparable to the others.
+        """
+        if transpiler.is_stochastic:
+            return self.num_runs, 1
+        return 1, self.num_runs
 
+    def _try_transpilation(
+        self, transpiler: CustomPassManager, circuit: QuantumCircuit, num_runs: int
+    ) -> List[dict]:
+        """Attempt to transpile num_runs times, returns the property sets."""
         self.logger.debug(
             f"Running transpiler {transpiler.name} on circuit {circuit.name}"
         )
         try:
-            transpiled_circuit = transpiler.run(circuit)
+            return transpiler.run_batch(circuit, num_runs)
         except Exception as e:
             raise ValueError("Transpiler failed") from e
-        return transpiled_circuit
 
     def run_single_circuit(self, circuit: QuantumCircuit):
         """Run a benchmark on a single circuit."""
-        self.logger.debug(f"Running benchmark for circuit {circuit.name}")
-        for transpiler in self.transpilers:
-            for _ in range(self.num_runs):
-                transpiled_circuit = self._try_transpilation(transpiler, circuit)
-                if transpiled_circuit is None:
+        # filter once per circuit, circuit.depth() is expensive
+        if not self._filter_circuit(circuit):
+            self.logger.debug(f"Skipping circuit {circuit.name} due to filtering")
+            return
+
+        circuit_name = circuit.name
+        self.logger.debug(f"Running benchmark for circuit {circuit_name}")
+        # bound once, these are looked up for every transpiler
+        metric_names = [metric.name for metric in self.metrics]
+        for transpiler, transpiler_name in zip(self.transpilers, self.transpiler_names):
+            if (transpiler_name, circuit_name) in self._completed:
+                continue
+            num_runs, num_copies = self._run_counts(transpiler)
+            # each run starts a new property set, so these are snapshots
+            property_sets = self._try_transpilation(transpiler, circuit, num_runs)
+            trials = {
+                name: [
+                    property_set.get(name)
+                    for property_set in property_sets
+                    for _ in range(num_copies)
+                ]
+                for name in metric_names
+            }
+            self._save_trials(transpiler_name, circuit_name, trials)
+
+    def _save_trials(
+        self, transpiler_name: str, circuit_name: str, trials: Dict[str, List]
+    ):
+        """Save the trials of a (transpiler, circuit) pair for each metric.
+
+        If results_path is set, they are also appended to it.
+        """
+        for metric in self.metrics:
+            metric.save_results(transpiler_name, circuit_name, trials[metric.name])
+
+        if self.results_path is not None:
+            row = {"transpiler": transpiler_name, "circuit": circuit_name}
+            row["trials"] = trials
+            with open(self.results_path, "a") as f:
+                f.write(json.dumps(row, default=_json_default) + "\n")
+            self._completed.add((transpiler_name, circuit_name))
+
+    def _load_results(self):
+        """Load the results saved in results_path by an earlier run.
+
+        Rows that are not results, missing one of the metrics, or cut
+        short by a crash, are ignored, so their pairs are run again.
+        """
+        metric_names = [metric.name for metric in self.metrics]
+        line = "\n"
+        with open(self.results_path) as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if not isinstance(row, dict) or any(
+                    key not in row for key in ("transpiler", "circuit", "trials")
+                ):
+                    continue
+                trials = row["trials"]
+                if not isinstance(trials, dict) or any(
+                    name not in trials for name in metric_names
+                ):
                     continue
                 for metric in self.metrics:
-                    metric.add_result(transpiler, transpiled_circuit.name)
+                    metric.save_results(
+                        row["transpiler"], row["circuit"], trials[metric.name]
+                    )
+                self._completed.add((row["transpiler"], row["circuit"]))
+
+        # end a line cut short by a crash, so new rows start on their own
+        if not line.endswith("\n"):
+            with open(self.results_path, "a") as f:
+                f.write("\n")
 
     def run(self):
         """Run benchmark."""
         self.logger.info("Running benchmarks for circuits...")
+        if self.num_workers > 1:
+            self._run_parallel()
+            return
+
         for submodule in self.submodules:
             total = submodule.circuit_count()
             circuit_iterator = submodule.get_quantum_circuits()
+            if self.prefetch_size > 0:
+                circuit_iterator = _prefetch(circuit_iterator, self.prefetch_size)
             for circuit in tqdm(
                 circuit_iterator,
                 total=total,
                 desc=f"Running circuits for {submodule.__class__.__name__}",
+                mininterval=PROGRESS_MININTERVAL,
+                miniters=max(1, total // 100),
             ):
                 self.run_single_circuit(circuit)
 
+    def _iter_tasks(self) -> Iterator[Tuple]:
+        """Yield a task for each run of each (transpiler, circuit) pair.
+
+        Circuits are only loaded and serialized as their tasks are taken.
+        Tasks are (pair, transpiler, circuit_qpy) tuples, where pair is a
+        dictionary shared by the runs of one (transpiler, circuit) pair,
+        collecting their results, see _run_parallel.
+        """
+        for submodule in self.submodules:
+            for circuit in submodule.get_quantum_circuits():
+                if not self._filter_circuit(circuit):
+                    self.logger.debug(
+                        f"Skipping circuit {circuit.name} due to filtering"
+                    )
+                    continue
+                # serialize once, shared by the tasks of every transpiler
+                circuit_qpy = _serialize_circuit(circuit)
+                for transpiler, transpiler_name in zip(
+                    self.transpilers, self.transpiler_names
+                ):
+                    if (transpiler_name, circuit.name) in self._completed:
+                        continue
+                    num_runs, num_copies = self._run_counts(transpiler)
+                    pair = {
+                        "transpiler": transpiler_name,
+                        "circuit": circuit.name,
+                        "num_copies": num_copies,
+                        "runs_left": num_runs,
+                        "records": [],
+                    }
+                    for _ in range(num_runs):
+                        yield pair, transpiler, circuit_qpy
+
+    def _run_parallel(self):
+        """Run benchmark, transpiling in a pool of worker processes.
+
+        Each run of a (transpiler, circuit) pair is a task of its own, so
+        the runs of one slow circuit are spread over several workers. At
+        most max(1, prefetch_size) tasks per worker are in flight, which
+        bounds the circuits held in memory, and new tasks are submitted as
+        others finish, across submodules. A pair is saved once its last run
+        and those of every pair before it are done, so the results are in
+        the same order as in a serial run. If a task fails, the queued
+        tasks are cancelled and its error is raised.
+        """
+        mp_context = None
+        if self.start_method is not None:
+            mp_context = multiprocessing.get_context(self.start_method)
+
+        metric_names = [metric.name for metric in self.metrics]
+        window = max(1, self.prefetch_size) * self.num_workers
+        tasks = self._iter_tasks()
+        in_flight = {}
+        # pairs in order of submission, until they are saved
+        pending = deque()
+        executor = ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=mp_context,
+            initializer=_init_worker,
+        )
+
+        def _submit(count: int):
+            for pair, transpiler, circuit_qpy in itertools.islice(tasks, count):
+                future = executor.submit(
+                    _transpile_and_measure, transpiler, circuit_qpy, metric_names, 1
+                )
+                in_flight[future] = pair
+                if not pending or pending[-1] is not pair:
+                    pending.append(pair)
+
+        # pairs to run, counting the circuits that will be filtered out
+        num_circuits = sum(submodule.circuit_count() for submodule in self.submodules)
+        total = max(0, num_circuits * len(self.transpilers) - len(self._completed))
+        try:
+            with tqdm(
+                total=total,
+                desc="Running circuits",
+                unit="pair",
+                mininterval=PROGRESS_MININTERVAL,
+                miniters=max(1, total // 100),
+            ) as progress:
+                _submit(window)
+                while in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    failed = None
+                    for future in done:
+                        pair = in_flight.pop(future)
+                        if future.exception() is not None:
+                            failed = future
+                            continue
+                        pair["records"].extend(future.result())
+                        pair["runs_left"] -= 1
+                    while pending and pending[0]["runs_left"] == 0:
+                        self._save_records(pending.popleft(), metric_names)
+                        progress.update()
+                    if failed is not None:
+                        failed.result()
+                    _submit(len(done))
+        except BaseException:
+            # the queued tasks would only delay the error
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown()
+
+    def _save_records(self, pair: dict, metric_names: List[str]):
+        """Save the results collected for a pair, see _iter_tasks."""
+        num_copies = pair["num_copies"]
+        trials = {
+            name: [
+                results[name] for results in pair["records"] for _ in range(num_copies)
+            ]
+            for name in metric_names
+        }
+        self._save_trials(pair["transpiler"], pair["circuit"], trials)
+
     def summary_statistics(
         self,
         metric: MetricInterface,
-        transpiler_1: CustomPassManager,
-        transpiler_2: CustomPassManager,
+        transpiler_1: Optional[CustomPassManager] = None,
+        transpiler_2: Optional[CustomPassManager] = None,
+        include_changes: bool = True,
     ) -> dict:
         """Calculate statistics for a specific metric and two transpilers.
 
@@ -107,60 +482,109 @@ class Benchmark:
             metric (MetricInterface): The metric to calculate statistics for.
             transpiler_1 (CustomPassManager): The baseline transpiler.
             transpiler_2 (CustomPassManager): The comparison transpiler.
+            include_changes (bool): Whether to include 'percent_changes'.
         Returns:
             dict: A dictionary containing the summary statistics.
                 - 'average_change': Average change of metric compared to baseline (%).
                 - 'best_circuit': The circuit that had the best improvement.
                 - 'worst_circuit': The circuit that had the worst improvement.
-                - 'percent_changes': Dict mapping circuit names to % changes.
+                - 'percent_changes': Dict mapping circuit names to % changes,
+                  only if include_changes is True.
+            Circuits whose baseline average is zero are left out, and
+            circuits with a NaN average are ignored. If no circuit is left,
+            e.g. the transpilers have no circuit in common, the average
+            change is NaN and the best and worst circuits are None.
+            If neither transpiler is given, returns the statistics of every
+            pair of transpilers, keyed by (baseline name, comparison name).
         """
         # Error checking
-        try:
-            assert metric in self.metrics
-            assert transpiler_1 in self.transpilers and transpiler_2 in self.transpilers
-        except AssertionError:
+        if id(metric) not in self._metric_ids:
+            raise ValueError("Invalid metric or transpiler")
+
+        if transpiler_1 is None and transpiler_2 is None:
+            return {
+                (t1.name, t2.name): self._pair_statistics(
+                    metric, t1, t2, include_changes
+                )
+                for t1, t2 in itertools.combinations(self.transpilers, 2)
+            }
+
+        if (
+            id(transpiler_1) not in self._transpiler_ids
+            or id(transpiler_2) not in self._transpiler_ids
+        ):
             raise ValueError("Invalid metric or transpiler")
+        return self._pair_statistics(
+            metric, transpiler_1, transpiler_2, include_changes
+        )
 
+    def _pair_statistics(
+        self,
+        metric: MetricInterface,
+        transpiler_1: CustomPassManager,
+        transpiler_2: CustomPassManager,
+        include_changes: bool,
+    ) -> dict:
+        """Calculate the statistics of one pair, see summary_statistics."""
         # Get the results as Dict[circuit_name, MetricResult]
-        circuit_results_1 = metric.saved_results[transpiler_1.name]
-        circuit_results_2 = metric.saved_results[transpiler_2.name]
-
-        change_percentages = []
-        percent_changes = {}
-
-        for circuit_name, result_1 in circuit_results_1.items():
-            if circuit_name in circuit_results_2:
-                result_2 = circuit_results_2[circuit_name]
-                change_percentage = (
-                    (result_2.average - result_1.average) / result_1.average
-                ) * 100
-                change_percentages.append(change_percentage)
-                percent_changes[circuit_name] = change_percentage
-
-        average_change = sum(change_percentages) / len(change_percentages)
-
-        if metric.is_lower_better:
-            # If lower is better, the best circuit has the most negative change
-            best_circuit = min(percent_changes, key=percent_changes.get)
-            # The worst circuit has the least negative (or most positive) change
-            worst_circuit = max(percent_changes, key=percent_changes.get)
+        circuit_results_1 = metric.saved_results.get(transpiler_1.name, {})
+        circuit_results_2 = metric.saved_results.get(transpiler_2.name, {})
+
+        # usually every transpiler ran every circuit, so no lookups are needed
+        if circuit_results_1.keys() == circuit_results_2.keys():
+            circuit_names = list(circuit_results_1)
         else:
-            # If higher is better, the best circuit has the most positive change
-            best_circuit = max(percent_changes, key=percent_changes.get)
-            # The worst circuit has the least positive (or most negative) change
-            worst_circuit = min(percent_changes, key=percent_changes.get)
-
-        return {
-            "average_change": average_change,
-            "best_circuit": best_circuit,
-            "worst_circuit": worst_circuit,
-            "percent_changes": percent_changes,
-        }
+            circuit_names = [
+                name for name in circuit_results_1 if name in circuit_results_2
+            ]
+
+        averages_1 = np.fromiter(
+            (circuit_results_1[name].average for name in circuit_names),
+            dtype=float,
+            count=len(circuit_names),
+        )
+        averages_2 = np.fromiter(
+            (circuit_results_2[name].average for name in circuit_names),
+            dtype=float,
+            count=len(circuit_names),
+        )
+        # a zero baseline has no relative change, so those circuits are left out
+        nonzero = averages_1 != 0
+        if not nonzero.all():
+            circuit_names = list(itertools.compress(circuit_names, nonzero))
+            averages_1 = averages_1[nonzero]
+            averages_2 = averages_2[nonzero]
+        changes = (averages_2 - averages_1) / averages_1 * 100
+
+        if np.isnan(changes).all():
+            # nothing to compare, e.g. one of the transpilers has no results
+            statistics = {
+                "average_change": float("nan"),
+                "best_circuit": None,
+                "worst_circuit": None,
+            }
+        else:
+            # circuits with a NaN average are ignored
+            average_change = float(np.nanmean(changes))
+            most_negative = circuit_names[int(np.nanargmin(changes))]
+            most_positive = circuit_names[int(np.nanargmax(changes))]
+
+            if metric.is_lower_better:
+                # If lower is better, the best circuit has the most negative change
+                best_circuit, worst_circuit = most_negative, most_positive
+            else:
+                # If higher is better, the best circuit has the most positive change
+                best_circuit, worst_circuit = most_positive, most_negative
 
-    # Below methods used for pretty printing results
-    # print(benchmark) will print a table of results
-    # FIXME, the following methods are redundant and should be consolidated
-    # Metric.prepare_plot_data
+            statistics = {
+                "average_change": average_change,
+                "best_circuit": best_circuit,
+                "worst_circuit": worst_circuit,
+            }
+
+        if include_changes:
+            statistics["percent_changes"] = dict(zip(circuit_names, changes.tolist()))
+        return statistics
 
     def __iter__(self):
         """Iterate over the results.
@@ -179,30 +603,43 @@ class Benchmark:
                         result.trials,
                     )
 
+    def _iter_by_transpiler(self):
+        """Iterate over the results grouped by transpiler, then by metric.
+
+        Transpilers and metrics come in the order they were given,
+        circuits in the order they were run, so nothing is sorted.
+        Yields tuples in the same format as __iter__.
+        """
+        for transpiler_name in self.transpiler_names:
+            for metric in self.metrics:
+                results_by_circuit = metric.saved_results.get(transpiler_name, {})
+                for circuit_name, result in results_by_circuit.items():
+                    yield (
+                        metric.name,
+                        transpiler_name,
+                        circuit_name,
+                        result.average,
+                        result.trials,
+                    )
+
     def __str__(self):
         """Return a string representation of the benchmark results."""
         output = []
-        sorted_results = sorted(
-            self, key=lambda x: (x[1], x[0], x[2])
-        )  # Sort by transpiler, then by metric, then by circuit
-        current_transpiler = ""
-        current_metric = ""
+        current_transpiler = None
+        current_metric = None
         for (
             metric_name,
             transpiler_name,
             circuit_name,
             mean_result,
             trials,
-        ) in sorted_results:
+        ) in self._iter_by_transpiler():
             if transpiler_name != current_transpiler:
-                output.append(f"\nTranspiler: {transpiler_name}")
+                output.append(TRANSPILER_FMT.format(transpiler_name))
                 current_transpiler = transpiler_name
+                current_metric = None
             if metric_name != current_metric:
-                output.append(f"\n  Metric: {metric_name}")
+                output.append(METRIC_FMT.format(metric_name))
                 current_metric = metric_name
-            output.append(
-                f"  Circuit: {circuit_name:<20} \
-                    Mean result: {mean_result:<10.3f} \
-                    Trials: {trials}"
-            )
+            output.append(ROW_FMT.format(circuit_name, mean_result, trials))
         return "\n".join(output)
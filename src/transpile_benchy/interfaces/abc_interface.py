@@ -12,16 +12,146 @@ which return QuantumCircuits. The latter is not yet implemented.
 Also, we write using Iterator, for sake of memory efficiency, don't want
 to spend time building all QuantumCircuits, only build them when needed.
 """
+import os
 import re
 from abc import ABC, abstractmethod
-from typing import Iterator, List, Optional
-
-from mqt.bench.benchmark_generator import get_benchmark
-from mqt.bench.utils import get_supported_benchmarks
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Hashable, Iterable, Iterator, List, Optional, Tuple, Union
 
 # from qiskit.circuit.exceptions import QasmError
 from qiskit import QuantumCircuit
 
+# number of built MQT Bench circuits kept in memory, shared by all the interfaces
+MQT_CACHE_SIZE = 256
+
+# benchmarks left out of MQTBench, building them takes too long
+_MQT_SKIPPED = ("shor", "groundstate")
+
+# circuits loaded ahead of the consumer by each worker process, see map_ahead
+LOAD_AHEAD = 2
+
+
+def compile_filters(filter_list: Union[str, List[str]]) -> re.Pattern:
+    """Compile the filter patterns into one regex matching any of them.
+
+    A str is a single pattern, not a sequence of one-character ones.
+    """
+    if isinstance(filter_list, str):
+        filter_list = [filter_list]
+    return re.compile("|".join(f"(?:{pattern})" for pattern in filter_list))
+
+
+def map_ahead(function: Callable, items: Iterable, num_workers: int) -> Iterator:
+    """Yield function(item) for each item, computed in a process pool.
+
+    Results are yielded in order. At most LOAD_AHEAD results per worker
+    are computed ahead of the consumer, so only those are held in memory.
+    """
+    items = iter(items)
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        pending = deque(
+            executor.submit(function, item)
+            for item in islice(items, LOAD_AHEAD * num_workers)
+        )
+        while pending:
+            result = pending.popleft().result()
+            for item in islice(items, 1):
+                pending.append(executor.submit(function, item))
+            yield result
+
+
+class CircuitCache:
+    """Least recently used cache of built circuits, e.g. parsed QASM files.
+
+    Unlike functools.lru_cache, a lookup never builds the circuit, so
+    circuits built elsewhere, e.g. in a worker process, can be stored.
+    A maxsize of None keeps every circuit, 0 disables the cache.
+    """
+
+    def __init__(self, maxsize: Optional[int]) -> None:
+        """Initialize an empty cache."""
+        self.maxsize = maxsize
+        self._circuits = OrderedDict()
+
+    def __len__(self):
+        """Return the number of cached circuits."""
+        return len(self._circuits)
+
+    def get(self, key: Hashable) -> Optional[QuantumCircuit]:
+        """Return the circuit cached for a key, or None."""
+        circuit = self._circuits.get(key)
+        if circuit is not None:
+            self._circuits.move_to_end(key)
+        return circuit
+
+    def put(self, key: Hashable, circuit: QuantumCircuit) -> None:
+        """Cache a circuit, evicting the least recently used if full."""
+        if self.maxsize == 0:
+            return
+        self._circuits[key] = circuit
+        self._circuits.move_to_end(key)
+        if self.maxsize is not None and len(self._circuits) > self.maxsize:
+            self._circuits.popitem(last=False)
+
+
+def map_cached(
+    function: Callable, keys: Iterable, cache: CircuitCache, num_workers: int
+) -> Iterator[Optional[QuantumCircuit]]:
+    """Yield the circuit of each key, from the cache or built by function.
+
+    Only the keys missing from the cache are built, in a process pool if
+    num_workers is greater than 1, see map_ahead. The built circuits are
+    stored in the cache here, so it fills even when they are built by
+    workers. Circuits are yielded as cached, so callers must copy them.
+    A function returning None, e.g. on failure, is not cached.
+    """
+    keys = list(keys)
+    # held here, so a hit evicted by the circuits built meanwhile is kept
+    hits = {}
+    for key in keys:
+        circuit = cache.get(key)
+        if circuit is not None:
+            hits[key] = circuit
+    missing = [key for key in keys if key not in hits]
+    if num_workers > 1:
+        built = map_ahead(function, missing, num_workers)
+    else:
+        built = map(function, missing)
+
+    try:
+        for key in keys:
+            circuit = hits.get(key)
+            if circuit is None:
+                circuit = next(built)
+                if circuit is not None:
+                    cache.put(key, circuit)
+            yield circuit
+    finally:
+        # shut down the pool if the consumer stops early
+        if num_workers > 1:
+            built.close()
+
+
+def _get_benchmark(key: Tuple[str, int]) -> QuantumCircuit:
+    """Build an algorithm level MQT Bench circuit of (name, size).
+
+    Defined at module level so it can be dispatched to a worker process.
+    """
+    # imported here, so only MQTBench users pay for importing mqt.bench
+    from mqt.bench.benchmark_generator import get_benchmark
+
+    benchmark_name, circuit_size = key
+    return get_benchmark(
+        benchmark_name=benchmark_name,
+        level="alg",
+        circuit_size=circuit_size,
+    )
+
+
+_mqt_cache = CircuitCache(MQT_CACHE_SIZE)
+
 
 class SubmoduleInterface(ABC):
     """Abstract class for a submodule."""
@@ -49,11 +179,24 @@ class MQTBench(SubmoduleInterface):  # TODO needs filtering
     """Submodule for MQTBench circuits."""
 
     def __init__(
-        self, num_qubits: int, filter_list: Optional[List[str]] = None
+        self,
+        num_qubits: int,
+        filter_list: Optional[List[str]] = None,
+        num_workers: Optional[int] = 0,
     ) -> None:
-        """Initialize MQTBench submodule."""
+        """Initialize MQTBench submodule.
+
+        If num_workers is greater than 1, the circuits are built ahead in
+        a pool of that many worker processes; None uses one per CPU, and
+        0 or 1 builds them serially.
+        """
+        from mqt.bench.utils import get_supported_benchmarks
+
         super().__init__()
         self.num_qubits = num_qubits
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        self.num_workers = num_workers
         self.raw_circuits = get_supported_benchmarks()
         self.raw_circuits = self.get_filtered_files(filter_list)
 
@@ -66,26 +209,21 @@ class MQTBench(SubmoduleInterface):  # TODO needs filtering
         if filter_list is None or self.raw_circuits is None:
             return self.raw_circuits
 
-        return [
-            s
-            for s in self.raw_circuits
-            if any(re.search(pattern, s) for pattern in filter_list)
-        ]
+        search = compile_filters(filter_list).search
+        return [s for s in self.raw_circuits if search(s)]
 
     def _get_quantum_circuits(self) -> Iterator[QuantumCircuit]:
-        """Return an iterator over QuantumCircuits."""
-        for bench_str in self.raw_circuits:
-            if bench_str in ["shor", "groundstate"]:
-                continue  # NOTE way too big
-                # yield get_benchmark(
-                #     benchmark_name=bench_str,
-                #     level="alg",
-                #     circuit_size=self.num_qubits,
-                #     benchmark_instance_name="xsmall"
-                # )
-            else:
-                yield get_benchmark(
-                    benchmark_name=bench_str,
-                    level="alg",
-                    circuit_size=self.num_qubits,
-                )
+        """Return an iterator over QuantumCircuits.
+
+        Circuits already in the cache are taken from it, only the others
+        are built, in worker processes if num_workers > 1.
+        """
+        # NOTE shor and groundstate are way too big
+        keys = [
+            (bench_str, self.num_qubits)
+            for bench_str in self.raw_circuits
+            if bench_str not in _MQT_SKIPPED
+        ]
+        for circuit in map_cached(_get_benchmark, keys, _mqt_cache, self.num_workers):
+            # copy, so the cached circuit is never modified
+            yield circuit.copy()
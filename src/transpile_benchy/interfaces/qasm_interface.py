@@ -1,21 +1,139 @@
 """QASM submodule interface."""
+import os
 import re
 from abc import abstractmethod
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Iterator, List, Optional
+from typing import Iterator, List, Optional, Tuple
 
 # from qiskit.circuit.exceptions import QasmError
 from qiskit import QuantumCircuit
 
-from transpile_benchy.interfaces.abc_interface import SubmoduleInterface
+from transpile_benchy.interfaces.abc_interface import (
+    CircuitCache,
+    SubmoduleInterface,
+    compile_filters,
+    map_cached,
+)
+
+# default number of parsed QASM files kept in memory, shared by all the
+# interfaces, see set_qasm_cache_size. None keeps every file parsed, so
+# a second pass over a submodule parses nothing, at the cost of holding
+# all the circuits loaded so far in memory.
+QASM_CACHE_SIZE = None
+
+# repository root, which holds the submodules directory
+_PREPATH = Path(__file__).resolve().parent.parent.parent.parent
+
+
+@lru_cache(maxsize=16)
+def _discover_qasm_files(directory: str, recursive: bool = True) -> Tuple[str, ...]:
+    """Return the QASM files in a directory under the repository root.
+
+    Paths are kept as strings, so only the files a caller keeps become
+    Path objects. Cached, so building the same interface again skips the
+    directory walk.
+    """
+    qasm_files = []
+    for root, _, files in os.walk(os.path.join(_PREPATH, directory)):
+        qasm_files.extend(
+            os.path.join(root, name) for name in files if name.endswith(".qasm")
+        )
+        if not recursive:
+            break
+    return tuple(qasm_files)
+
+
+def _qasm_key(file: Path) -> Tuple[str, Optional[int], Optional[int]]:
+    """Return the cache key of a QASM file.
+
+    The modification time and size are part of the key, so an edited
+    file is parsed again.
+    """
+    try:
+        stat = file.stat()
+    except OSError:
+        # left to _read_qasm_file to report
+        return str(file), None, None
+    return str(file), stat.st_mtime_ns, stat.st_size
+
+
+def _read_qasm_file(
+    key: Tuple[str, Optional[int], Optional[int]]
+) -> Optional[QuantumCircuit]:
+    """Parse the QASM file of a cache key, or return None if it fails.
+
+    Defined at module level so it can be dispatched to a worker process.
+    """
+    path = key[0]
+    try:
+        # the parser reads the file itself, without a Python string copy
+        return QuantumCircuit.from_qasm_file(path)
+    except Exception as e:
+        print(f"Failed to load {path}: {e}")
+        return None
+
+
+_qasm_cache = CircuitCache(QASM_CACHE_SIZE)
+
+
+def set_qasm_cache_size(maxsize: Optional[int]) -> None:
+    """Set how many parsed QASM files are kept in memory.
+
+    The cache only saves parsing when the same files are loaded again
+    before being evicted, so repeated passes over a submodule need it to
+    be at least as large as the submodule. None, the default, keeps every
+    file, 0 disables the cache. A bound caps the memory held by parsed
+    circuits, e.g. for a single pass over large submodules. The cached
+    files are dropped.
+    """
+    global _qasm_cache
+    _qasm_cache = CircuitCache(maxsize)
+
+
+def _named_copy(
+    circuit: Optional[QuantumCircuit], file: Path
+) -> Optional[QuantumCircuit]:
+    """Return a copy of a cached circuit, named after its file."""
+    if circuit is None:
+        return None
+    # copy, so the cached circuit is never modified
+    qc = circuit.copy()
+    qc.name = file.stem
+    return qc
+
+
+def _load_qasm_file(file: Path) -> Optional[QuantumCircuit]:
+    """Load a QASM file, named after the file."""
+    (circuit,) = map_cached(_read_qasm_file, [_qasm_key(file)], _qasm_cache, 0)
+    return _named_copy(circuit, file)
 
 
 class QASMInterface(SubmoduleInterface):
     """Abstract class for a submodule that has QASM files."""
 
-    def __init__(self, filter_list) -> None:
-        """Initialize QASM submodule."""
-        self.raw_circuits = self.get_filtered_files(filter_list)
+    def __init__(self, filter_list, num_workers: Optional[int] = 0) -> None:
+        """Initialize QASM submodule.
+
+        If num_workers is greater than 1, the files are parsed ahead in
+        a pool of that many worker processes; None uses one per CPU, and
+        0 or 1 parses them serially. The files are only listed once they
+        are first needed.
+        """
+        self.filter_list = filter_list
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        self.num_workers = num_workers
+
+    @cached_property
+    def qasm_files(self) -> Tuple[Path, ...]:
+        """Return all the QASM files of the submodule."""
+        return self._get_qasm_files()
+
+    @cached_property
+    def raw_circuits(self) -> Tuple[Path, ...]:
+        """Return the QASM files left after filtering."""
+        return self.get_filtered_files(self.filter_list)
 
     def __len__(self):
         """Return the number of circuits."""
@@ -23,89 +141,93 @@ class QASMInterface(SubmoduleInterface):
 
     def _load_qasm_file(self, file: Path) -> QuantumCircuit:
         """Load a QASM file."""
-        try:
-            with open(file, "r") as f:
-                qc = QuantumCircuit.from_qasm_str(f.read())
-                qc.name = file.stem
-            return qc
-        except Exception as e:
-            print(f"Failed to load {file}: {e}")
-            return None
+        return _load_qasm_file(file)
 
     def _get_quantum_circuits(self) -> Iterator[QuantumCircuit]:
-        """Return an iterator over QuantumCircuits."""
-        for file in self.raw_circuits:
-            yield self._load_qasm_file(file)
+        """Return an iterator over QuantumCircuits.
 
-    def get_filtered_files(self, filter_list) -> List:
-        """Return a list of filtered QASM files."""
+        Files already in the parse cache are loaded from it, only the
+        others are parsed, in worker processes if num_workers > 1.
+        """
+        files = self.raw_circuits
+        keys = map(_qasm_key, files)
+        circuits = map_cached(_read_qasm_file, keys, _qasm_cache, self.num_workers)
+        for file, circuit in zip(files, circuits):
+            yield _named_copy(circuit, file)
+
+    def get_filtered_files(self, filter_list) -> Tuple[Path, ...]:
+        """Return a tuple of filtered QASM files."""
         if filter_list is None or self.qasm_files is None:
             return self.qasm_files
 
-        return [
-            s
-            for s in self.qasm_files
-            if any(re.search(pattern, s.stem) for pattern in filter_list)
-        ]
+        search = compile_filters(filter_list).search
+        return tuple(s for s in self.qasm_files if search(s.stem))
 
     def __str__(self):
         """Build string as all the available circuit names."""
         return str([s.stem for s in self.qasm_files])
 
     @abstractmethod
-    def _get_qasm_files(self, directory: str) -> List[Path]:
-        """Return a list of QASM files."""
+    def _get_qasm_files(self) -> Tuple[Path, ...]:
+        """Return a tuple of QASM files."""
         raise NotImplementedError
 
 
 class QASMBench(QASMInterface):
     """Submodule for QASMBench circuits."""
 
-    def __init__(self, size: str, filter_list: Optional[List[str]] = None):
+    def __init__(
+        self,
+        size: str,
+        filter_list: Optional[List[str]] = None,
+        num_workers: Optional[int] = 0,
+    ):
         """Initialize QASMBench submodule.
 
         size: 'small', 'medium', or 'large'
         """
         self.size = size
-        self.qasm_files = self._get_qasm_files("QASMBench", self.size)
-        super().__init__(filter_list)
-
-    def _get_qasm_files(self, directory: str, size: str) -> List[Path]:
-        """Return a list of QASM files."""
-        prepath = Path(__file__).resolve().parent.parent.parent.parent
-        qasm_files = prepath.glob(f"submodules/{directory}/{size}/**/*.qasm")
-        # filter out the transpiled files
-        qasm_files = filter(lambda file: "_transpiled" not in str(file), qasm_files)
-        # harcode, remove these files that are just way too big or glithcing
-        # cc_n12 has classical control, so it's not a good candidate
-        # some are here just because we haven't implemented exclude fitler yet
-        manual_reject = [
-            "vqe",
-            "bwt",
-            "ising_n26",
-            "inverseqft_n4",
-            "cc_n12",
-            "wstate_n27",
-        ]
-        qasm_files = filter(
-            lambda file: not any(x in str(file) for x in manual_reject), qasm_files
+        super().__init__(filter_list, num_workers)
+
+    # filter out the transpiled files
+    # harcode, remove these files that are just way too big or glithcing
+    # cc_n12 has classical control, so it's not a good candidate
+    # some are here just because we haven't implemented exclude fitler yet
+    _REJECT = re.compile(
+        "|".join(
+            [
+                "_transpiled",
+                "vqe",
+                "bwt",
+                "ising_n26",
+                "inverseqft_n4",
+                "cc_n12",
+                "wstate_n27",
+            ]
         )
-        return list(qasm_files)
+    )
+
+    def _get_qasm_files(self) -> Tuple[Path, ...]:
+        """Return a tuple of QASM files."""
+        qasm_files = _discover_qasm_files(f"submodules/QASMBench/{self.size}")
+        # one scan of each path for all the rejected names
+        reject = self._REJECT.search
+        return tuple(Path(file) for file in qasm_files if not reject(file))
 
 
 class RedQueen(QASMInterface):
     """Submodule for RedQueen circuits."""
 
-    def __init__(self, filter_str: Optional[str] = None):
+    def __init__(
+        self, filter_str: Optional[str] = None, num_workers: Optional[int] = 0
+    ):
         """Initialize RedQueen submodule."""
-        self.qasm_files = self._get_qasm_files("red-queen")
-        super().__init__(filter_str)
+        super().__init__(filter_str, num_workers)
 
-    def _get_qasm_files(self, directory: str) -> List[Path]:
-        """Return a list of QASM files."""
-        prepath = Path(__file__).resolve().parent.parent.parent.parent
-        qasm_files = prepath.glob(f"submodules/{directory}/red_queen/games/**/*.qasm")
-        return list(qasm_files)
+    def _get_qasm_files(self) -> Tuple[Path, ...]:
+        """Return a tuple of QASM files."""
+        qasm_files = _discover_qasm_files("submodules/red-queen/red_queen/games")
+        return tuple(map(Path, qasm_files))
 
 
 class Queko(QASMInterface):
@@ -114,13 +236,15 @@ class Queko(QASMInterface):
     NOTE: Queko is a subset of RedQueen, so we don't need to add it to the library.
     """
 
-    def __init__(self, filter_list: Optional[str] = None):
+    def __init__(
+        self, filter_list: Optional[str] = None, num_workers: Optional[int] = 0
+    ):
         """Initialize Queko submodule."""
-        self.qasm_files = self._get_qasm_files("QUEKO-benchmark")
-        super().__init__(filter_list)
-
-    def _get_qasm_files(self, directory: str) -> List[Path]:
-        """Return a list of QASM files."""
-        prepath = Path(__file__).resolve().parent.parent.parent.parent
-        qasm_files = prepath.glob(f"submodules/{directory}/BNTF/*.qasm")
-        return list(qasm_files)
+        super().__init__(filter_list, num_workers)
+
+    def _get_qasm_files(self) -> Tuple[Path, ...]:
+        """Return a tuple of QASM files."""
+        qasm_files = _discover_qasm_files(
+            "submodules/QUEKO-benchmark/BNTF", recursive=False
+        )
+        return tuple(map(Path, qasm_files))
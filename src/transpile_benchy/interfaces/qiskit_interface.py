@@ -32,7 +32,7 @@ class QiskitFunctionInterface(SubmoduleInterface):
 
         This factory generates Qiskit functions of a given type for a
         specific list of qubit counts. The generated functions can then
-        be retrieved as a list through the generate_functions method.
+        be retrieved as a list through the generate_list method.
         """
 
         def __init__(self, function_type: Type[Callable], num_qubits: List[int]):
@@ -40,19 +40,19 @@ class QiskitFunctionInterface(SubmoduleInterface):
             self.function_type = function_type
             self.num_qubits = num_qubits
 
+        def generate_list(self) -> List[Callable]:
+            """Generate a list of quantum functions, one per qubit count."""
+            return [self._create_function(n) for n in self.num_qubits]
+
         def generate_functions(self) -> Dict[str, Callable]:
-            """Generate a dictionary of quantum functions."""
-            return {
-                # f"{self.function_type.__name__.lower()}_{n}": self._create_function(n)
-                f"{self.function_type.__name__}": self._create_function(n)
-                for n in self.num_qubits
-            }
+            """Generate a dictionary of quantum functions, keyed by name."""
+            return {func.name: func for func in self.generate_list()}
 
         def _create_function(self, num_qubits: int) -> Callable:
             """Create a quantum function given number of qubits."""
             func = self.function_type(num_qubits)
-            # func.name = f"{self.function_type.__name__.lower()}_{num_qubits}"
-            func.name = f"{self.function_type.__name__}"
+            # results are keyed by circuit name, so each size needs its own
+            func.name = f"{self.function_type.__name__.lower()}_{num_qubits}"
             return func
 
     def __init__(self, function_type: Type[Callable], num_qubits: List[int]) -> None:
@@ -62,4 +62,4 @@ class QiskitFunctionInterface(SubmoduleInterface):
 
     def _get_quantum_circuits(self) -> List[Callable]:
         """Return functions generated by the QuantumFunctionFactory."""
-        return list(self.function_factory.generate_functions().values())
+        return self.function_factory.generate_list()
@@ -12,21 +12,36 @@ if TYPE_CHECKING:
     from transpile_benchy.passmanagers.abc_runner import CustomPassManager
 
 import inspect
+import math
+import sys
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
-from statistics import mean
-from typing import List
+from typing import List, Optional
 
 from qiskit.transpiler.basepasses import AnalysisPass
-from scipy.stats.mstats import gmean
 
 
-@dataclass
 class Result:
-    """A class to handle results of multiple trials."""
+    """A class to handle results of multiple trials.
 
-    metric: "MetricInterface"
-    trials: List = field(default_factory=list)
+    The sum, log-sum, minimum, maximum and (with Welford's algorithm)
+    the sum of squared deviations are updated as each trial is added, so
+    the statistics are read in constant time.
+    """
+
+    __slots__ = ("metric", "trials", "_sum", "_log_sum", "_min", "_max", "_mean", "_m2")
+
+    def __init__(self, metric: MetricInterface, trials: Optional[List] = None):
+        """Initialize the result, folding in any initial trials."""
+        self.metric = metric
+        self.trials = []
+        self._sum = 0.0
+        self._log_sum = 0.0
+        self._min = math.inf
+        self._max = -math.inf
+        self._mean = 0.0
+        self._m2 = 0.0
+        if trials:
+            self.add_trials(trials)
 
     def __repr__(self) -> str:
         """Pretty print the result."""
@@ -34,15 +49,42 @@ class Result:
 
     def add_trial(self, value):
         """Add a trial result."""
-        self.trials.append(value)
+        self.add_trials((value,))
+
+    def add_trials(self, values):
+        """Add several trial results, growing the trial list once."""
+        # values is read twice, so an iterator must not be used up
+        values = list(values)
+        n = len(self.trials)
+        self.trials.extend(values)
+        for value in values:
+            n += 1
+            self._sum += value
+            # as scipy's gmean: a zero trial gives 0, a negative one NaN
+            if value > 0:
+                self._log_sum += math.log(value)
+            else:
+                self._log_sum += -math.inf if value == 0 else math.nan
+            self._min = min(self._min, value)
+            self._max = max(self._max, value)
+            delta = value - self._mean
+            self._mean += delta / n
+            self._m2 += delta * (value - self._mean)
 
     @property
     def average(self):
         """Calculate the average of the trial results."""
         if self.metric.use_geometric_mean:
-            return gmean(self.trials)
-        else:
-            return mean(self.trials)
+            return math.exp(self._log_sum / len(self.trials))
+        return self._sum / len(self.trials)
+
+    @property
+    def stderr(self):
+        """Return the standard error of the arithmetic mean of the trials."""
+        n = len(self.trials)
+        if n < 2:
+            return 0.0
+        return math.sqrt(self._m2 / (n - 1) / n)
 
     @property
     def best(self):
@@ -51,12 +93,12 @@ class Result:
         If is_lower_better is True for the metric, lower values are
         considered better.
         """
-        return min(self.trials) if self.metric.is_lower_better else max(self.trials)
+        return self._min if self.metric.is_lower_better else self._max
 
     @property
     def worst(self):
         """Return the worst trial result."""
-        return max(self.trials) if self.metric.is_lower_better else min(self.trials)
+        return self._max if self.metric.is_lower_better else self._min
 
 
 class MetricInterface(ABC):
@@ -92,47 +134,72 @@ class MetricInterface(ABC):
     def clear_saved_results(self):
         """Clear all saved results."""
         self.saved_results = {}
+        self._plot_data = None
 
-    def add_result(self, transpiler: CustomPassManager, circuit_name: str):
+    def add_result(
+        self, transpiler: CustomPassManager, circuit_name: str, num_copies: int = 1
+    ):
         """Add a result to the saved results.
 
         Args:
             transpiler (CustomPassManager): The used transpiler.
             circuit_name (str): The name of the circuit.
+            num_copies (int): How many trials the result counts for.
         """
         result = transpiler.property_set.get(self.name, None)
-        if result is None:
-            raise ValueError(f"Result for {self.name} not found in property set.")
+        self.save_results(transpiler.name, circuit_name, [result] * num_copies)
 
-        if transpiler.name not in self.saved_results:
-            self.saved_results[transpiler.name] = {}
+    def save_results(self, transpiler_name: str, circuit_name: str, results: List):
+        """Save the results of one or more trials.
 
-        if circuit_name not in self.saved_results[transpiler.name]:
-            self.saved_results[transpiler.name][circuit_name] = Result(self)
-
-        self.saved_results[transpiler.name][circuit_name].add_trial(result)
+        Args:
+            transpiler_name (str): The name of the used transpiler.
+            circuit_name (str): The name of the circuit.
+            results (List): The value of the metric for each trial.
+        """
+        if any(result is None for result in results):
+            raise ValueError(f"Result for {self.name} not found in property set.")
 
-    def get_result(self, transpiler: CustomPassManager, circuit_name: str) -> Result:
-        """Get a result from the saved results."""
-        return self.saved_results[transpiler.name][circuit_name]
+        circuit_results = self.saved_results.setdefault(transpiler_name, {})
+        result = circuit_results.get(circuit_name)
+        if result is None:
+            # interned, so the other metrics and transpilers share the key
+            result = circuit_results[sys.intern(circuit_name)] = Result(self)
+        result.add_trials(results)
+        self._plot_data = None
+
+    def get_result(
+        self, transpiler: CustomPassManager, circuit_name: str
+    ) -> Optional[Result]:
+        """Get a result from the saved results.
+
+        Returns None if there is no result for the transpiler and
+        circuit, without adding any entries to the saved results.
+        """
+        return self.saved_results.get(transpiler.name, {}).get(circuit_name)
 
     def prepare_plot_data(self):
-        """Sort and parse the result dictionary for plotting."""
+        """Sort and parse the result dictionary for plotting.
+
+        Returns (circuit_name, {transpiler_name: Result}) pairs. The
+        sorted data is cached until a new result is saved.
+        """
+        if self._plot_data is not None:
+            return self._plot_data
+
         result_dict = {}
 
         for transpiler_name, results_by_circuit in self.saved_results.items():
             for circuit_name, result in results_by_circuit.items():
-                if circuit_name not in result_dict:
-                    result_dict[circuit_name] = []
-                result_dict[circuit_name].append((transpiler_name, result))
+                result_dict.setdefault(circuit_name, {})[transpiler_name] = result
 
         # Sort by the average result of the first transpiler
-        sorted_results = sorted(
+        self._plot_data = sorted(
             result_dict.items(),
-            key=lambda x: x[1][0][1].average,
+            key=lambda x: next(iter(x[1].values())).average,
         )
 
-        return sorted_results
+        return self._plot_data
 
     @abstractmethod
     def _construct_pass(self, **kwargs):
@@ -6,6 +6,7 @@ transpilers. The run() method is also defined here which runs the three
 processing methods and returns the resulting circuit.
 """
 from abc import ABC, abstractmethod
+from typing import List
 
 from qiskit.transpiler import PassManager
 
@@ -24,14 +25,23 @@ class CustomPassManager(ABC):
     a routing stage. Note that if we were to integrate our custom pass
     more directly into existing Qiskit architecture, we might handle
     this differently.
+
+    Subclasses whose result does not change between runs should set
+    is_stochastic to False, so the benchmark only runs them once.
+    Subclasses whose stages do not depend on properties of an earlier
+    run can set reuse_stages to True, so the stages are built once.
     """
 
+    is_stochastic = True
+    reuse_stages = False
+
     def __init__(self, name=None):
         """Initialize the runner."""
         self.name = name or self.__class__.__name__
         self.property_set = {}
         self.metric_passes = PassManager()
         self.stages_builder = self.stage_builder()
+        self._stages = None
 
     def stage_builder(self):
         """Override this method to define the builder function for stages."""
@@ -40,6 +50,18 @@ class CustomPassManager(ABC):
         #     yield PassManager()  # dummy stage
         # return _builder
 
+    def __getstate__(self):
+        """Drop the stage builder closure, which cannot be pickled."""
+        state = self.__dict__.copy()
+        del state["stages_builder"]
+        state["_stages"] = None
+        return state
+
+    def __setstate__(self, state):
+        """Restore the state and rebuild the stage builder."""
+        self.__dict__.update(state)
+        self.stages_builder = self.stage_builder()
+
     def _clear_metrics(self):
         """Clear the metrics from the transpiler."""
         self.metric_passes = PassManager()
@@ -48,19 +70,54 @@ class CustomPassManager(ABC):
         """Append a analysis pass, using transpiler-specific configuration."""
         self.metric_passes.append(metric.construct_pass(self))
 
+    def _install_metric_passes(self, metrics: List[MetricInterface]):
+        """Replace the metric passes with those of metrics, in one append."""
+        self.metric_passes = PassManager()
+        if metrics:
+            self.metric_passes.append(
+                [metric.construct_pass(self) for metric in metrics]
+            )
+
+    def reset(self):
+        """Reset the property set, keeping the stages and metric passes."""
+        self.property_set = {}
+
+    def _get_stages(self):
+        """Return the stages to run, built once if reuse_stages is set."""
+        if not self.reuse_stages:
+            return self.stages_builder()
+        if self._stages is None:
+            self._stages = list(self.stages_builder())
+        return self._stages
+
     def run(self, circuit):
         """Run the transpiler on the circuit."""
-        self.property_set = {}  # reset property set
-        for stage in self.stages_builder():
+        self.reset()
+        for stage in self._get_stages():
             stage.property_set = self.property_set
             circuit = stage.run(circuit)
             self.property_set.update(stage.property_set)
 
-        # run metrics
+        self._run_metrics(circuit)
+        return circuit
+
+    def _run_metrics(self, circuit):
+        """Run the metric passes on a transpiled circuit."""
         self.metric_passes.property_set = self.property_set
         self.metric_passes.run(circuit)
         self.property_set.update(self.metric_passes.property_set)
-        return circuit
+
+    def run_batch(self, circuit, num_runs: int) -> List[dict]:
+        """Run the transpiler num_runs times on the circuit.
+
+        Returns the property set of each run. Subclasses that can
+        transpile several copies at once should override this.
+        """
+        property_sets = []
+        for _ in range(num_runs):
+            self.run(circuit)
+            property_sets.append(self.property_set)
+        return property_sets
 
 
 class ThreeStageRunner(CustomPassManager):
@@ -30,8 +30,8 @@ class QiskitStage(PassManager):
         config = cls.CONFIGS.get(optimization_level)
         if not config:
             raise ValueError(f"Invalid level. Choose from {list(cls.CONFIGS.keys())}.")
-        config.update(kwargs)  # Merge predefined config with provided kwargs
-        return cls(**config)
+        # Merge predefined config with provided kwargs, without mutating CONFIGS
+        return cls(**{**config, **kwargs})
 
     def run(self, circuit):
         """Run the transpiler on the circuit."""
@@ -41,6 +41,8 @@ class QiskitStage(PassManager):
 class QiskitBaseline(CustomPassManager):
     """QiskitBaseline uses Qiskit's built-in transpilation strategies."""
 
+    reuse_stages = True
+
     def __init__(self, optimization_level: int, **transpiler_kwargs):
         """Initialize the QiskitBaseline."""
         super().__init__(name=f"Qiskit_o{optimization_level}")
@@ -1,19 +1,52 @@
 """Render module for transpile_benchy."""
+from __future__ import annotations
 
-from typing import Tuple
+from typing import TYPE_CHECKING
 
+if TYPE_CHECKING:
+    # only needed for annotations, plotting works on an existing benchmark
+    from transpile_benchy.benchmark import Benchmark
+
+from contextlib import contextmanager
+from typing import Iterator, Tuple
+
+import matplotlib
 import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib.figure import Axes, Figure
 from matplotlib.ticker import MaxNLocator
 
-from transpile_benchy.benchmark import Benchmark
-from transpile_benchy.metrics.abc_metrics import MetricInterface
+# metrics that are recorded but not plotted
+SKIPPED_METRICS = frozenset({"accepted_subs"})
+
+# set once per plot call, restored when the style context exits
+PLOT_RCPARAMS = {
+    "mathtext.fontset": "cm",
+    "legend.fontsize": 8,
+    "axes.labelsize": 10,
+}
 
 
 # ===========================
 # Plot Initialization
 # ===========================
+@contextmanager
+def _plot_style(usetex: bool) -> Iterator[None]:
+    """Apply the plot style, restored when the context exits."""
+    with plt.style.context(["ipynb", "colorsblind10"]):
+        plt.rcParams.update({**PLOT_RCPARAMS, "text.usetex": usetex})
+        yield
+
+
+def _bar_layout(transpiler_count: int) -> Tuple[float, np.ndarray]:
+    """Return the bar width and the RGBA color of each transpiler."""
+    # XXX manually adjust as needed
+    # Adjust bar width according to number of transpilers
+    bar_width = 2.0 / transpiler_count
+    cmap = matplotlib.colormaps["tab10"].resampled(transpiler_count)
+    return bar_width, cmap(np.arange(transpiler_count))
+
+
 def _initialize_plot(legend_show: bool) -> Tuple[Figure, Axes]:
     """Initialize the plot and returns the fig and ax."""
     ref_size = 1.25  # Assume need .4 for legend
@@ -33,36 +66,50 @@ def _initialize_plot(legend_show: bool) -> Tuple[Figure, Axes]:
     return fig, ax
 
 
+def _average_matrix(sorted_results: list, transpiler_names: list) -> np.ndarray:
+    """Collect the averages into a dense (transpilers, circuits) array.
+
+    Circuits without a result for a transpiler are NaN.
+    """
+    column = {name: j for j, name in enumerate(transpiler_names)}
+    averages = np.full((len(transpiler_names), len(sorted_results)), np.nan)
+    for i, (_, circuit_results) in enumerate(sorted_results):
+        for transpiler_name, result in circuit_results.items():
+            j = column.get(transpiler_name)
+            if j is not None:
+                averages[j, i] = result.average
+    return averages
+
+
 def _plot_bars(
-    ax: Axes, cmap, sorted_results: list, transpiler_count: int, bar_width: float
+    ax: Axes,
+    colors: np.ndarray,
+    averages: np.ndarray,
+    x_base: np.ndarray,
+    transpiler_names: list,
+    bar_width: float,
 ) -> None:
-    """Plot a bar for each circuit and each transpiler."""
-    for i, (circuit_name, circuit_results) in enumerate(sorted_results):
-        for j, (transpiler_name, result) in enumerate(circuit_results):
-            # Plot the average without label
-            ax.bar(
-                i * transpiler_count + j * bar_width,
-                result.average,
-                width=bar_width,
-                color=cmap(j),
-            )
-
-            # # Mark the best result
-            # ax.scatter(
-            #     i * transpiler_count + j * bar_width,
-            #     result.best,
-            #     color="black",
-            #     marker="*",
-            #     s=10,
-            # )
+    """Plot a bar for each circuit and each transpiler.
 
+    The bars of each transpiler are drawn with a single call, from its
+    row of the averages array, offset from the x_base of each circuit.
+    NaN averages are left empty.
+    """
+    for j, transpiler_name in enumerate(transpiler_names):
+        # Plot the averages, labelled so the legend can reuse the bars
+        ax.bar(
+            x_base + j * bar_width,
+            averages[j],
+            width=bar_width,
+            color=colors[j],
+            label=f"{transpiler_name}",
+        )
 
-def _plot_legend(axs: Axes, metric: MetricInterface, cmap) -> None:
-    """Plot the legend on the given axes."""
-    for j, transpiler_name in enumerate(metric.saved_results.keys()):
-        axs[0].bar(0, 0, color=cmap(j), label=f"{transpiler_name}")
 
-    axs[0].legend(loc="center", ncol=2, fontsize=8, frameon=False)
+def _plot_legend(axs: Axes) -> None:
+    """Plot the legend of the bars in axs[1] on axs[0]."""
+    handles, labels = axs[1].get_legend_handles_labels()
+    axs[0].legend(handles, labels, loc="center", ncol=2, fontsize=8, frameon=False)
     axs[0].axis("off")
 
 
@@ -73,6 +120,7 @@ def _configure_plot(
     ax: Axes,
     y_label: str,
     sorted_results: list,
+    x_base: np.ndarray,
     transpiler_count: int,
     bar_width: float,
 ) -> None:
@@ -86,13 +134,7 @@ def _configure_plot(
         min_fontsize,
     )
 
-    plt.rc("legend", fontsize=8)
-    plt.rc("axes", labelsize=10)
-
-    ax.set_xticks(
-        np.arange(len(sorted_results)) * transpiler_count
-        + bar_width * (transpiler_count - 1) / 2,
-    )
+    ax.set_xticks(x_base + bar_width * (transpiler_count - 1) / 2)
     ax.set_xticklabels(
         [x[0] for x in sorted_results],  # Use sorted keys
         rotation=30,
@@ -115,36 +157,113 @@ def plot_benchmark(
     legend_show: bool = True,
     save: bool = False,
     filename: str = "",
+    usetex: bool = True,
+    show: bool = True,
 ) -> None:
-    """Plot benchmark results."""
-    with plt.style.context(["ipynb", "colorsblind10"]):
-        plt.rcParams["text.usetex"] = True
+    """Plot benchmark results.
+
+    With usetex=False, labels are rendered with matplotlib's mathtext
+    instead of calling out to LaTeX, which is much faster. With
+    show=False, the figures are only saved, e.g. for headless runs with
+    the Agg backend. Each figure is closed once it is shown or saved.
+    """
+    with _plot_style(usetex):
+        transpiler_names = benchmark.transpiler_names
+        transpiler_count = len(transpiler_names)
+        bar_width, colors = _bar_layout(transpiler_count)
 
         for metric in benchmark.metrics:
-            if metric.name == "accepted_subs":
+            if metric.name in SKIPPED_METRICS:
                 continue  # We are not plotting this
 
             fig, ax = _initialize_plot(legend_show)
 
-            # XXX manually adjust as needed
-            # Adjust bar width according to number of transpilers
-            transpiler_count = len(metric.saved_results.keys())
-            bar_width = 2.0 / transpiler_count
-
-            cmap = plt.cm.get_cmap("tab10", transpiler_count)
-
             sorted_results = metric.prepare_plot_data()
-            _plot_bars(ax, cmap, sorted_results, transpiler_count, bar_width)
+            x_base = np.arange(len(sorted_results)) * transpiler_count
+
+            averages = _average_matrix(sorted_results, transpiler_names)
+            _plot_bars(ax, colors, averages, x_base, transpiler_names, bar_width)
 
             _configure_plot(
-                ax, metric.pretty_name, sorted_results, transpiler_count, bar_width
+                ax,
+                metric.pretty_name,
+                sorted_results,
+                x_base,
+                transpiler_count,
+                bar_width,
             )
 
             if legend_show:
-                _plot_legend(fig.axes, metric, cmap)
+                _plot_legend(fig.axes)
 
-            plt.show()
+            if show:
+                plt.show()
 
             if save:
                 # fig.savefig(f"{metric.name}_benchmark.svg", dpi=300)
                 fig.savefig(f"{filename}_{metric.name}_benchmark.svg", dpi=300)
+
+            # free the figure, otherwise pyplot keeps every one of them open
+            plt.close(fig)
+
+
+def plot_benchmark_grid(
+    benchmark: Benchmark,
+    save: bool = False,
+    filename: str = "",
+    usetex: bool = True,
+    show: bool = True,
+) -> Figure:
+    """Plot all benchmark metrics as rows of a single figure.
+
+    The rows share the x-axis, so the circuits are ordered as in the
+    first plotted metric and labelled once, under the last row. The
+    legend is drawn once, above the first row. With show=False, the
+    figure is returned open, for the caller to adjust, save or close.
+    """
+    metrics = [m for m in benchmark.metrics if m.name not in SKIPPED_METRICS]
+    if not metrics:
+        raise ValueError("No metrics to plot")
+
+    with _plot_style(usetex):
+        ref_size = 1.25
+        fig, axs = plt.subplots(
+            len(metrics) + 1,
+            figsize=(3.5, ref_size * len(metrics) + 0.4),
+            sharex=True,
+            gridspec_kw={
+                "height_ratios": [0.4] + [ref_size] * len(metrics),
+                "hspace": 0.1,
+            },
+        )
+
+        transpiler_names = benchmark.transpiler_names
+        transpiler_count = len(transpiler_names)
+        bar_width, colors = _bar_layout(transpiler_count)
+
+        circuit_names = [name for name, _ in metrics[0].prepare_plot_data()]
+        x_base = np.arange(len(circuit_names)) * transpiler_count
+        for ax, metric in zip(axs[1:], metrics):
+            results = dict(metric.prepare_plot_data())
+            sorted_results = [(name, results.get(name, {})) for name in circuit_names]
+            averages = _average_matrix(sorted_results, transpiler_names)
+            _plot_bars(ax, colors, averages, x_base, transpiler_names, bar_width)
+            _configure_plot(
+                ax,
+                metric.pretty_name,
+                sorted_results,
+                x_base,
+                transpiler_count,
+                bar_width,
+            )
+
+        _plot_legend(axs)
+
+        if save:
+            fig.savefig(f"{filename}_benchmark.svg", dpi=300)
+
+        if show:
+            plt.show()
+            # shown, so free it; otherwise the caller owns the open figure
+            plt.close(fig)
+    return fig